@@ -1,25 +1,73 @@
 import sqlite3
+import hashlib
 import os
 import argparse
-from typing import List, Tuple, Optional, Any
-from groq import Groq, GroqError
+import re
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "Enter Your API Key Here")
 GROQ_MODEL = "llama-3.3-70b-versatile"
+GROQ_FAST_MODEL = "llama-3.1-8b-instant"
+FAST_MODEL_MAX_WORDS = 40
+_COMPLEX_QUERY = re.compile(r"\bjoin\b|\bgroup\s+by\b|\bacross\b|\bper\s", re.IGNORECASE)
+_FAST_SHOW_ALL = re.compile(r"^(?:show|list|display|get)\s+(?:me\s+)?(?:all|everything)(?:\s+(?:rows?|records?|entries))?$")
+_FAST_COUNT = re.compile(r"^count(?:\s+(?:all\s+)?(?:rows?|records?|entries))?$")
+_FAST_FIRST_N = re.compile(r"^(?:show\s+(?:me\s+)?)?(?:the\s+)?(?:first|top)\s+(\d+)(?:\s+(?:rows?|records?|entries))?$")
+_FAST_HOW_MANY = re.compile(r"^how\s+many\s+(\w+)(?:\s+(?:are\s+there|in\s+total))?$")
+SQL_STOP_SEQUENCES = [";", "\n\n"]
+_SQL_CLEAN = re.compile(r"^\s*(?:```(?:sql)?\s*)?(.*?)\s*;?\s*(?:```\s*)?$", re.DOTALL | re.IGNORECASE)
+RESPONSE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "nl2sql.db")
+RESULTS_TABLE = "nl2sql_results"
+SCHEMA_MANIFEST_SUFFIX = ".schema.json"
+BATCH_MAX_WORKERS = 8
+FETCH_ARRAYSIZE = 1000
+OUTPUT_FLUSH_ROWS = 10000
 
-try:
-    client = Groq(api_key=GROQ_API_KEY)
-    print("Groq client initialized successfully.")
-except GroqError as e:
-    print(f"Error initializing Groq client: {e}")
-    exit(1)
-except Exception as e:
-    print(f"An unexpected error occurred during Groq client initialization: {e}")
-    exit(1)
+_client = None
+_client_lock = threading.Lock()
 
-def get_db_schema(cursor: sqlite3.Cursor) -> Tuple[Optional[str], Optional[List[str]]]:
+def _groq_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            return _client
+
+        import httpx
+        from groq import Groq, GroqError
+
+        try:
+            _client = Groq(
+                api_key=GROQ_API_KEY,
+                http_client=httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_keepalive_connections=BATCH_MAX_WORKERS)
+                )
+            )
+            print("Groq client initialized successfully.")
+        except GroqError as e:
+            print(f"Error initializing Groq client: {e}")
+            exit(1)
+        except Exception as e:
+            print(f"An unexpected error occurred during Groq client initialization: {e}")
+            exit(1)
+        return _client
+
+_SCHEMA_CACHE: Dict[Tuple[str, int], Tuple[str, List[str]]] = {}
+
+def get_db_schema(cursor: sqlite3.Cursor, db_path: str) -> Tuple[Optional[str], Optional[List[str]]]:
+    tables = None
     try:
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        schema_version = cursor.execute("PRAGMA schema_version;").fetchone()[0]
+        cached = _SCHEMA_CACHE.get((db_path, schema_version))
+        if cached is not None:
+            table_name, columns = cached
+            return table_name, list(columns)
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name != ?;", (RESULTS_TABLE,))
         tables = cursor.fetchall()
         if not tables:
             print("Error: No tables found in the database.")
@@ -27,10 +75,10 @@ def get_db_schema(cursor: sqlite3.Cursor) -> Tuple[Optional[str], Optional[List[
             
         table_name = tables[0][0]
         print(f"Using the first table found: '{table_name}'")
-        cursor.execute(f"PRAGMA table_info(`{table_name}`);")
-        columns_info = cursor.fetchall()
-        columns = [column[1] for column in columns_info]
-        return table_name, columns
+        cursor.execute("SELECT name FROM pragma_table_info(?) ORDER BY cid;", (table_name,))
+        columns = [row[0] for row in cursor.fetchall()]
+        _SCHEMA_CACHE[(db_path, schema_version)] = (table_name, columns)
+        return table_name, list(columns)
     except sqlite3.Error as e:
         print(f"SQLite error while fetching schema for table '{tables[0][0] if tables else 'N/A'}': {e}")
         return None, None
@@ -38,149 +86,444 @@ def get_db_schema(cursor: sqlite3.Cursor) -> Tuple[Optional[str], Optional[List[
         print(f"An unexpected error occurred fetching schema: {e}")
         return None, None
 
-def generate_sql_query(
-    user_input: str,
-    database_name: str,
+def _schema_fingerprint(db_path: str) -> Dict[str, Any]:
+    wal = None
+    try:
+        wal_stat = os.stat(db_path + "-wal")
+        if wal_stat.st_size:
+            wal = [wal_stat.st_size, wal_stat.st_mtime_ns]
+    except FileNotFoundError:
+        pass
+    return {"mtime_ns": os.stat(db_path).st_mtime_ns, "wal": wal}
+
+def load_schema_manifest(db_path: str) -> Optional[Tuple[str, List[str]]]:
+    try:
+        with open(db_path + SCHEMA_MANIFEST_SUFFIX, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["fingerprint"] != _schema_fingerprint(db_path):
+            return None
+        return manifest["table"], list(manifest["columns"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def save_schema_manifest(
+    db_path: str,
+    fingerprint: Dict[str, Any],
     table_name: str,
     columns: List[str]
-) -> Optional[str]:
+) -> None:
+    manifest = {"fingerprint": fingerprint, "table": table_name, "columns": columns}
+    try:
+        with open(db_path + SCHEMA_MANIFEST_SUFFIX, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+    except OSError as e:
+        print(f"Warning: Could not write schema manifest: {e}")
+
+def load_schema(conn: sqlite3.Connection, db_path: str) -> Tuple[Optional[str], Optional[List[str]]]:
+    manifest = load_schema_manifest(db_path)
+    if manifest is not None:
+        return manifest
+
+    fingerprint = _schema_fingerprint(db_path)
+    table_name, columns = get_db_schema(conn.cursor(), db_path)
+    if table_name and columns:
+        save_schema_manifest(db_path, fingerprint, table_name, columns)
+    return table_name, columns
+
+def _response_cache_key(system_prompt: str, user_input: str, model: str) -> str:
+    payload = "\x00".join((system_prompt, user_input, model))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _open_response_cache() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(RESPONSE_CACHE_PATH), exist_ok=True)
+    cache = sqlite3.connect(RESPONSE_CACHE_PATH)
+    cache.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, sql TEXT NOT NULL)")
+    return cache
+
+def get_cached_response(key: str) -> Optional[str]:
+    try:
+        cache = _open_response_cache()
+        try:
+            row = cache.execute("SELECT sql FROM responses WHERE key = ?", (key,)).fetchone()
+        finally:
+            cache.close()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: Could not read response cache: {e}")
+        return None
+    return row[0] if row else None
+
+def store_cached_response(key: str, sql_query: str) -> None:
+    try:
+        cache = _open_response_cache()
+        try:
+            with cache:
+                cache.execute("INSERT OR REPLACE INTO responses (key, sql) VALUES (?, ?)", (key, sql_query))
+        finally:
+            cache.close()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: Could not write response cache: {e}")
+
+def _fast_sql(user_input: str, table_name: str, columns: List[str], quiet: bool = False) -> Optional[str]:
+    text = " ".join(user_input.lower().split()).rstrip("?.!")
+    table = f"`{table_name}`"
+
+    first_n = _FAST_FIRST_N.match(text)
+    how_many = _FAST_HOW_MANY.match(text)
+    if _FAST_SHOW_ALL.match(text):
+        sql_query = f"SELECT * FROM {table}"
+    elif _FAST_COUNT.match(text):
+        sql_query = f"SELECT COUNT(*) FROM {table}"
+    elif first_n:
+        sql_query = f"SELECT * FROM {table} LIMIT {int(first_n.group(1))}"
+    elif how_many and how_many.group(1) in ("rows", "records", "entries", table_name.lower()):
+        sql_query = f"SELECT COUNT(*) FROM {table}"
+    else:
+        return None
+
+    if not quiet:
+        print(f"Generated SQL Query (rule-based): {sql_query}")
+    return sql_query
+
+def _pick_model(user_input: str) -> str:
+    if _COMPLEX_QUERY.search(user_input) or len(user_input.split()) > FAST_MODEL_MAX_WORDS:
+        return GROQ_MODEL
+    return GROQ_FAST_MODEL
+
+def _system_prompt(table_name: str, columns: List[str]) -> str:
     columns_str = ", ".join(f"`{col}`" for col in columns)
-    system_prompt = (
-        f"You are a helpful assistant that converts plain English questions into SQL queries "
-        f"for a SQLite database. "
-        f"The relevant table name is `{table_name}` and its columns are: {columns_str}. "
-        f"IMPORTANT: Your output must be ONLY the SQL query itself, with no explanations, "
-        f"markdown formatting (like ```sql), comments (--), or any surrounding text. "
-        f"Ensure the query is valid SQLite syntax and only uses the provided table and columns."
-        f"Prioritize SELECT statements. Only generate other types (INSERT, UPDATE, DELETE) if explicitly asked."
+    return (
+        f"SQLite. Table `{table_name}`({columns_str}). "
+        "Output one SQL query only, no fences/comments/prose. "
+        "Use only these columns. Write data only if explicitly asked."
     )
 
+def get_cached_sql(
+    user_input: str,
+    table_name: str,
+    columns: List[str],
+    model: Optional[str] = None
+) -> Optional[str]:
+    model = model or _pick_model(user_input)
+    system_prompt = _system_prompt(table_name, columns)
+    return get_cached_response(_response_cache_key(system_prompt, user_input, model))
+
+def cache_generated_sql(
+    user_input: str,
+    table_name: str,
+    columns: List[str],
+    sql_query: str,
+    model: Optional[str] = None
+) -> None:
+    model = model or _pick_model(user_input)
+    system_prompt = _system_prompt(table_name, columns)
+    store_cached_response(_response_cache_key(system_prompt, user_input, model), sql_query)
+
+def generate_sql_query(
+    user_input: str,
+    table_name: str,
+    columns: List[str],
+    model: Optional[str] = None,
+    quiet: bool = False
+) -> Optional[str]:
+    log = print if not quiet else lambda *args, **kwargs: None
+    model = model or _pick_model(user_input)
+    system_prompt = _system_prompt(table_name, columns)
+
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_input},
     ]
 
-    print("\n--- Sending request to Groq API ---")
-    print(f"User Query: {user_input}")
-    print("------------------------------------")
+    log("\n--- Sending request to Groq API ---")
+    log(f"User Query: {user_input}")
+    log(f"Model: {model}")
+    log("------------------------------------")
+
+    client = _groq_client()
+    from groq import GroqError
 
     try:
         response = client.chat.completions.create(
-            model=GROQ_MODEL,
+            model=model,
             messages=messages,
             max_tokens=150,
-            temperature=0.2,
-            stop=None
+            temperature=0,
+            stop=SQL_STOP_SEQUENCES,
+            stream=True
         )
-        sql_query = response.choices[0].message.content.strip()
-
-        if sql_query.startswith("```sql"):
-            sql_query = sql_query[6:]
-        if sql_query.endswith("```"):
-            sql_query = sql_query[:-3]
-        sql_query = sql_query.strip().rstrip(';')
-
-        if not sql_query.upper().startswith("SELECT"):
-            print(f"Warning: Generated query might modify data: {sql_query}")
+        pieces = []
+        for chunk in response:
+            piece = chunk.choices[0].delta.content
+            if not piece:
+                continue
+            if ";" in piece:
+                pieces.append(piece.split(";", 1)[0])
+                break
+            pieces.append(piece)
+        response.close()
+        sql_query = _SQL_CLEAN.match("".join(pieces)).group(1)
 
         if not sql_query:
-            print("Error: LLM returned an empty query.")
+            log("Error: LLM returned an empty query.")
             return None
 
-        print(f"Generated SQL Query (raw): {sql_query}")
+        log(f"Generated SQL Query (raw): {sql_query}")
         return sql_query
 
     except GroqError as e:
-        print(f"Groq API error during SQL generation: {e}")
+        log(f"Groq API error during SQL generation: {e}")
         return None
     except Exception as e:
-        print(f"An unexpected error occurred during SQL generation: {e}")
+        log(f"An unexpected error occurred during SQL generation: {e}")
         return None
 
-def execute_sql_query(db_path: str, query: str) -> Optional[List[Tuple[Any, ...]]]:
+def open_db_connection(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+    except sqlite3.OperationalError as e:
+        print(f"Warning: Could not enable WAL mode ({e}); using the default journal.")
+    conn.execute("PRAGMA cache_size=-64000;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    return conn
+
+def confirm_changes(affected_rows: int) -> bool:
+    try:
+        answer = input(f"Commit changes to {affected_rows} row(s)? [y/N] ")
+    except (EOFError, KeyboardInterrupt):
+        print()
+        return False
+    return answer.strip().lower() in ("y", "yes")
+
+def _plan_writes(plan: List[Tuple[Any, ...]]) -> bool:
+    return any(step[1] == "Transaction" and step[3] for step in plan)
+
+def execute_sql_query(
+    conn: sqlite3.Connection,
+    query: str,
+    confirm: bool = False
+) -> Optional[Tuple[Iterator[Tuple[Any, ...]], bool, bool]]:
     if not query:
         print("Error: No SQL query provided to execute.")
         return None
 
-    conn = None
     try:
-        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
-        print(f"\nExecuting SQL Query: {query}")
-        cursor.execute(query)
+        cursor.arraysize = FETCH_ARRAYSIZE
+        try:
+            writes = _plan_writes(cursor.execute("EXPLAIN " + query).fetchall())
+        except sqlite3.Error as e:
+            print(f"Generated SQL failed validation: {e}")
+            print(f"Rejected Query: {query}")
+            return None
 
-        is_select_query = query.strip().upper().startswith("SELECT")
+        print(f"\nExecuting SQL Query: {query}")
+        if not writes:
+            cursor.execute(query)
+            print("Query executed successfully.")
+            return iter_rows(cursor), cursor.description is not None, True
 
-        if is_select_query:
-            result = cursor.fetchall()
-            print(f"Query executed successfully. Fetched {len(result)} rows.")
-        else:
+        print(f"Warning: Generated query might modify data: {query}")
+        changes_before = conn.total_changes
+        conn.execute("SAVEPOINT nl2sql")
+        cursor.execute(query)
+        returns_rows = cursor.description is not None
+        rows = cursor.fetchall() if returns_rows else []
+        affected_rows = conn.total_changes - changes_before
+        print(f"Query affected {affected_rows} row(s).")
+        if confirm and not confirm_changes(affected_rows):
+            conn.execute("ROLLBACK TO nl2sql")
+            conn.execute("RELEASE nl2sql")
             conn.commit()
-            result = []
-            print("Non-SELECT query executed and changes committed.")
+            print("Changes rolled back.")
+            return iter(()), False, False
 
-        conn.close()
-        return result
+        conn.execute("RELEASE nl2sql")
+        conn.commit()
+        print("Non-SELECT query executed and changes committed.")
+        return iter(rows), returns_rows, True
     except sqlite3.Error as e:
         print(f"SQLite error during execution: {e}")
         print(f"Failed Query: {query}")
-        if conn:
-            conn.close()
+        conn.rollback()
         return None
     except Exception as e:
         print(f"An unexpected error occurred during query execution: {e}")
-        if conn:
-            conn.close()
+        conn.rollback()
         return None
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Convert natural language to SQL queries using Groq and execute them on a SQLite DB.",
-        epilog="Example: python nl_to_sql_groq.py my_database.db -q 'Show me all users from California'"
-    )
-    parser.add_argument("db_path", help="Path to the SQLite database file.")
-    parser.add_argument("-q", "--query", help="Natural language query (prompts if not provided)", default=None)
+def iter_rows(cursor: sqlite3.Cursor) -> Iterator[Tuple[Any, ...]]:
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            return
+        yield from rows
 
-    args = parser.parse_args()
-    database_path = args.db_path
+def load_batch_queries(batch_path: str) -> List[str]:
+    queries = []
+    with open(batch_path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if isinstance(entry, dict):
+                entry = entry.get("nl")
+            if not isinstance(entry, str) or not entry.strip():
+                raise ValueError(f"line {line_no} has no natural language query")
+            queries.append(entry)
+    return queries
 
-    if not os.path.exists(database_path):
-        print(f"Error: Database file not found at '{database_path}'")
+def run_batch(
+    conn: sqlite3.Connection,
+    batch_path: str,
+    db_path: str,
+    confirm: bool = False
+) -> None:
+    try:
+        queries = load_batch_queries(batch_path)
+    except (OSError, ValueError) as e:
+        print(f"Error reading batch file '{batch_path}': {e}")
         return
 
-    if GROQ_API_KEY == "Enter Your API Key Here":
-        print("\nWarning: Groq API key is not set.")
-        print("Please set the GROQ_API_KEY environment variable or replace the placeholder in the script.")
+    if not queries:
+        print("Batch file contains no queries. Exiting.")
+        return
 
-    conn = None
-    try:
-        conn = sqlite3.connect(database_path)
-        cursor = conn.cursor()
-        database_name = os.path.basename(database_path).split(".")[0]
-        table_name, columns = get_db_schema(cursor)
-        conn.close()
+    table_name, columns = load_schema(conn, db_path)
+    if not table_name or not columns:
+        print("Failed to read database schema.")
+        return
 
-        if not table_name or not columns:
-            return
+    print(f"Generating SQL for {len(queries)} queries...")
+    fast_queries = [_fast_sql(nl, table_name, columns, quiet=True) for nl in queries]
+    cached_queries = [
+        None if fast_sql else get_cached_sql(nl, table_name, columns)
+        for nl, fast_sql in zip(queries, fast_queries)
+    ]
+    known_queries = [fast_sql or cached_sql for fast_sql, cached_sql in zip(fast_queries, cached_queries)]
+    if not all(known_queries):
+        _groq_client()
+    with ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as executor:
+        sql_queries = list(executor.map(
+            lambda nl, known_sql: known_sql or generate_sql_query(nl, table_name, columns, quiet=True),
+            queries,
+            known_queries
+        ))
 
+    batch = []
+    for i, (nl, fast_sql, cached_sql, sql_query) in enumerate(
+        zip(queries, fast_queries, cached_queries, sql_queries), 1
+    ):
+        print(f"\n--- Batch query {i}/{len(queries)}: {nl} ---")
+        if not sql_query:
+            print("Failed to generate SQL query.")
+        elif fast_sql:
+            print(f"Generated SQL Query (rule-based): {fast_sql}")
+        elif cached_sql:
+            print(f"Generated SQL Query (cached): {cached_sql}")
+        result = execute_sql_query(conn, sql_query, confirm) if sql_query else None
+        if result is not None and result[2] and not (fast_sql or cached_sql):
+            cache_generated_sql(nl, table_name, columns, sql_query)
+        try:
+            rows_json = json.dumps(list(result[0]), default=str) if result is not None else None
+        except sqlite3.Error as e:
+            print(f"SQLite error while fetching rows: {e}")
+            rows_json = None
+        batch.append((nl, sql_query, rows_json))
+
+    try:
+        with conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {RESULTS_TABLE} ("
+                "id INTEGER PRIMARY KEY, nl TEXT NOT NULL, sql TEXT, rows_json TEXT)"
+            )
+            conn.executemany(
+                f"INSERT INTO {RESULTS_TABLE}(nl, sql, rows_json) VALUES(?, ?, ?)",
+                batch
+            )
     except sqlite3.Error as e:
-        print(f"SQLite error connecting to DB or getting schema: {e}")
-        if conn: conn.close()
+        print(f"SQLite error while saving batch results: {e}")
         return
-    except Exception as e:
-        print(f"An unexpected error occurred during DB setup: {e}")
-        if conn: conn.close()
+
+    failed = sum(1 for _, _, rows_json in batch if rows_json is None)
+    print(f"\nBatch complete: {len(batch) - failed} succeeded, {failed} failed. Results saved to '{RESULTS_TABLE}'.")
+
+def run_once(
+    conn: sqlite3.Connection,
+    user_input: str,
+    db_path: str,
+    confirm: bool = False
+) -> None:
+    table_name, columns = load_schema(conn, db_path)
+    if not table_name or not columns:
+        print("Failed to read database schema.")
         return
 
-    if args.query:
-        user_input = args.query
-        print(f"Using provided query: {user_input}")
+    fast_sql = _fast_sql(user_input, table_name, columns)
+    cached_sql = None if fast_sql else get_cached_sql(user_input, table_name, columns)
+    if cached_sql:
+        print(f"Generated SQL Query (cached): {cached_sql}")
+    sql_query = fast_sql or cached_sql or generate_sql_query(user_input, table_name, columns)
+
+    if not sql_query:
+        print("Failed to generate SQL query.")
+        return
+
+    result = execute_sql_query(conn, sql_query, confirm)
+
+    if result is not None:
+        rows, returns_rows, applied = result
+        if applied and not (fast_sql or cached_sql):
+            cache_generated_sql(user_input, table_name, columns, sql_query)
+        print("\n--- Query Results ---")
+        row_count = 0
+        out = sys.stdout
+        buf: List[str] = []
+        append = buf.append
+        try:
+            for row_count, row in enumerate(rows, 1):
+                append(f"Row {row_count}: {row}\n")
+                if len(buf) >= OUTPUT_FLUSH_ROWS:
+                    out.write("".join(buf))
+                    buf.clear()
+        except sqlite3.Error as e:
+            out.write("".join(buf))
+            print(f"SQLite error while fetching rows: {e}")
+            return
+        out.write("".join(buf))
+        if row_count == 0 and returns_rows:
+            print("(Query executed successfully, but returned no matching rows)")
+
     else:
+        print("\nQuery execution failed.")
+
+def run_serve(
+    conn: sqlite3.Connection,
+    db_path: str,
+    table_name: str
+) -> None:
+    print(f"Serving queries from stdin (using table '{table_name}'). Send EOF to stop.")
+    try:
+        for line in sys.stdin:
+            user_input = line.strip()
+            if user_input:
+                run_once(conn, user_input, db_path)
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        print("\nOperation cancelled by user. Exiting.")
+
+def run_repl(
+    conn: sqlite3.Connection,
+    db_path: str,
+    table_name: str,
+    confirm: bool = False
+) -> None:
+    print(f"\nEnter your queries (using table '{table_name}'). Type 'exit' or press Ctrl-D to quit.")
+    while True:
         try:
-            user_input = input(f"\nPlease enter your query (using table '{table_name}'):\n> ")
-            if not user_input:
-                print("No input provided. Exiting.")
-                return
+            user_input = input("sql> ").strip()
         except EOFError:
             print("\nInput stream closed. Exiting.")
             return
@@ -188,25 +531,78 @@ def main():
             print("\nOperation cancelled by user. Exiting.")
             return
 
-    sql_query = generate_sql_query(user_input, database_name, table_name, columns)
+        if not user_input:
+            continue
+        if user_input.lower() in ("exit", "quit"):
+            return
+        run_once(conn, user_input, db_path, confirm)
 
-    if not sql_query:
-        print("Failed to generate SQL query. Exiting.")
+def run(conn: sqlite3.Connection, args: argparse.Namespace, database_path: str) -> None:
+    try:
+        table_name, columns = load_schema(conn, database_path)
+
+        if not table_name or not columns:
+            return
+
+    except sqlite3.Error as e:
+        print(f"SQLite error getting schema: {e}")
+        return
+    except Exception as e:
+        print(f"An unexpected error occurred during DB setup: {e}")
         return
 
-    results = execute_sql_query(database_path, sql_query)
+    if args.batch:
+        run_batch(conn, args.batch, database_path, args.confirm)
+        return
 
-    if results is not None:
-        print("\n--- Query Results ---")
-        if results:
-            for i, row in enumerate(results):
-                print(f"Row {i+1}: {row}")
-        else:
-            if sql_query.strip().upper().startswith("SELECT"):
-                print("(Query executed successfully, but returned no matching rows)")
+    if args.serve:
+        run_serve(conn, database_path, table_name)
+        return
 
+    if args.query:
+        print(f"Using provided query: {args.query}")
+        run_once(conn, args.query, database_path, args.confirm)
     else:
-        print("\nQuery execution failed.")
+        run_repl(conn, database_path, table_name, args.confirm)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert natural language to SQL queries using Groq and execute them on a SQLite DB.",
+        epilog="Example: python nl_to_sql_groq.py my_database.db -q 'Show me all users from California'"
+    )
+    parser.add_argument("db_path", help="Path to the SQLite database file.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("-q", "--query", help="Natural language query (starts an interactive session if not provided)", default=None)
+    mode.add_argument("-i", "--interactive", action="store_true", help="Prompt for queries in a loop until EOF or 'exit' (the default without -q)")
+    mode.add_argument("--serve", action="store_true", help="Read natural language queries from stdin, one per line, reusing one API session and DB connection")
+    mode.add_argument("--batch", metavar="FILE", help=f"JSONL file of natural language queries to run; results are stored in the '{RESULTS_TABLE}' table", default=None)
+
+    parser.add_argument("--confirm", action="store_true", help="Ask before committing queries that modify data")
+
+    args = parser.parse_args()
+    if args.confirm and args.serve:
+        parser.error("--confirm cannot be used with --serve, which reads queries from stdin")
+    database_path = args.db_path
+
+    if not os.path.exists(database_path):
+        print(f"Error: Database file not found at '{database_path}'")
+        return
+
+    if GROQ_API_KEY == "Enter Your API Key Here":
+        print("\nWarning: Groq API key is not set.")
+        print("Please set the GROQ_API_KEY environment variable or replace the placeholder in the script.")
+        print("Only simple queries (e.g. 'show all', 'count rows', 'first 10 rows') can be answered without it.")
+
+    try:
+        conn = open_db_connection(database_path)
+    except sqlite3.Error as e:
+        print(f"SQLite error connecting to DB: {e}")
+        return
+
+    try:
+        run(conn, args, database_path)
+    finally:
+        conn.close()
 
 if __name__ == "__main__":
     main()